@@ -1,16 +1,48 @@
 """
 config_reader.py
 Reads region/environment configuration from an Excel file.
+
+Rows can be layered: a row with Country "*" and Environment "*" holds global
+defaults, and a row with a real country and Environment "*" holds defaults for
+that country. Blank cells in a lower layer inherit from the layer above,
+except BRANCH_NAME, which only an environment row can set.
+Each layer is stored only as the values it changes, and the flattened view of
+a (country, environment) is built on first use and then cached.
 """
 
 import openpyxl
+from collections import ChainMap
 from pathlib import Path
+from typing import Iterator
+
+from schema import compile_schema, validate_rows
+
+WILDCARD = "*"
+BRANCH_KEY = "BRANCH_NAME"     # never inherited from a layer row
+
+LAYER_GLOBAL      = "global"
+LAYER_COUNTRY     = "country"
+LAYER_ENVIRONMENT = "environment"
+
+
+def _differs(parent, key, value) -> bool:
+    # Compared with the type, like intern(): a 1 under a True is a change.
+    inherited = parent.get(key)
+    return (type(inherited), inherited) != (type(value), value)
 
 
 class ConfigReader:
-    def __init__(self, excel_path: str):
+    def __init__(self, excel_path: str, schema: dict | None = None):
         self.excel_path = Path(excel_path)
-        self._data: list[dict] = []
+        self._headers: list[str] = []
+        # (None, None) → global, (country, None) → country, (country, env) → env.
+        self._layers: dict[tuple, dict] = {}
+        self._rows: list[tuple[str, str]] = []
+        self._resolved: dict[tuple[str, str], dict] = {}
+        self._errors: dict[tuple[str, str], list[str]] = {}
+        self._sheet_errors: list[str] = []
+        # Compiled once; reused on every reload.
+        self._validators = compile_schema(schema or {})
         self._load()
 
     def _load(self):
@@ -21,28 +53,159 @@ class ConfigReader:
         ws = wb.active
 
         headers = [cell.value for cell in ws[1] if cell.value]
-        self._data = []
+        pool: dict = {}
 
-        for row in ws.iter_rows(min_row=2, values_only=True):
+        def intern(value):
+            # Keyed on type too, so 1, 1.0 and True stay distinct.
+            return pool.setdefault((type(value), value), value)
+
+        raw: dict[tuple, dict] = {}
+        first_seen: dict[tuple, int] = {}
+        duplicates: dict[tuple, list[str]] = {}
+        sheet_errors: list[str] = []
+        for line, row in enumerate(ws.iter_rows(min_row=2, values_only=True), start=2):
             if not any(row):
                 continue
             record = dict(zip(headers, row))
-            if record.get("Country") and record.get("Environment"):
-                self._data.append(record)
+            country, env = record.get("Country"), record.get("Environment")
+            if not (country and env):
+                continue
+            where = f"Row {line} ({country} / {env})"
+            if country == WILDCARD:
+                if env != WILDCARD:
+                    sheet_errors.append(f"{where}: ignored, a '*' country needs a '*' environment")
+                    continue
+                key = (None, None)
+            else:
+                key = (country, None if env == WILDCARD else env)
+            if key in first_seen:
+                # Like a plain lookup, the first row wins; the repeat is reported.
+                error = f"{where}: duplicate of row {first_seen[key]}, ignored"
+                sheet_errors.append(error)
+                if key[1] is not None:
+                    duplicates.setdefault(key, []).append(error)
+                continue
+            first_seen[key] = line
+            values = {k: intern(v) for k, v in record.items() if v is not None}
+            if key[1] is None:
+                # Only environment rows say which country/environment they are.
+                values.pop("Country", None)
+                values.pop("Environment", None)
+                # A branch belongs to one row; inherited, every row below would share it.
+                if values.pop(BRANCH_KEY, None) is not None:
+                    sheet_errors.append(f"{where}: {BRANCH_KEY} is ignored on a layer row")
+                # Layer rows are partial, so only the cells they fill are checked.
+                sheet_errors.extend(
+                    f"{where}: {err}"
+                    for k, v in values.items()
+                    if k in self._validators and (err := self._validators[k](v))
+                )
+            raw[key] = values
 
         wb.close()
 
+        # Store each layer as a delta against everything above it.
+        layers: dict[tuple, dict] = {(None, None): raw.pop((None, None), {})}
+        for key in [k for k in raw if k[1] is None]:
+            parent = layers[(None, None)]
+            layers[key] = {k: v for k, v in raw.pop(key).items() if _differs(parent, k, v)}
+        for key, values in raw.items():
+            parent = self._chain(layers, *key)
+            layers[key] = {k: v for k, v in values.items() if _differs(parent, k, v)}
+
+        self._headers = headers
+        self._layers = layers
+        self._rows = list(raw)
+        self._resolved = {}
+        views = [self._chain(layers, *key) for key in self._rows]
+        self._errors = {
+            self._rows[i]: errs for i, errs in validate_rows(views, self._validators).items()
+        }
+        for key, errs in duplicates.items():
+            self._errors.setdefault(key, []).extend(errs)
+        self._sheet_errors = sheet_errors
+
+    @staticmethod
+    def _chain(layers: dict, country: str, environment: str | None) -> ChainMap:
+        maps = [layers.get((country, None), {}), layers.get((None, None), {})]
+        if environment is not None:
+            maps.insert(0, layers.get((country, environment), {}))
+        return ChainMap(*maps)
+
     def get_countries(self) -> list[str]:
-        return sorted(set(r["Country"] for r in self._data))
+        return sorted(set(c for c, _ in self._rows))
 
     def get_environments(self, country: str) -> list[str]:
-        return sorted(set(r["Environment"] for r in self._data if r["Country"] == country))
+        return sorted(set(e for c, e in self._rows if c == country))
 
     def get_config(self, country: str, environment: str) -> dict | None:
-        for record in self._data:
-            if record["Country"] == country and record["Environment"] == environment:
-                return record
-        return None
+        key = (country, environment)
+        if key not in self._layers:
+            return None
+        if key not in self._resolved:
+            view = self._chain(self._layers, *key)
+            self._resolved[key] = {h: view.get(h) for h in self._headers}
+        return self._resolved[key]
+
+    def iter_configs(self, country: str = None, environment: str = None) -> Iterator[dict]:
+        """
+        Yields the flattened config of every valid row, optionally filtered.
+        Unlike get_config, nothing is cached, so walking a huge sheet stays flat
+        in memory.
+        """
+        for key in self._rows:
+            if key in self._errors:
+                continue
+            if country and key[0] != country or environment and key[1] != environment:
+                continue
+            if key in self._resolved:
+                yield self._resolved[key]
+            else:
+                view = self._chain(self._layers, *key)
+                yield {h: view.get(h) for h in self._headers}
+
+    def get_sources(self, country: str, environment: str) -> dict[str, str]:
+        """Maps each key of the config to the layer that supplied its value."""
+        names = {
+            (country, environment): LAYER_ENVIRONMENT,
+            (country, None): LAYER_COUNTRY,
+            (None, None): LAYER_GLOBAL,
+        }
+        sources = {}
+        for key, name in names.items():
+            for k in self._layers.get(key, {}):
+                sources.setdefault(k, name)
+        return sources
+
+    def get_errors(self, country: str, environment: str) -> list[str]:
+        return self._errors.get((country, environment), [])
+
+    def get_invalid_rows(self) -> list[tuple[dict, list[str]]]:
+        return [(self.get_config(*key), self._errors[key]) for key in self._rows if key in self._errors]
+
+    def get_sheet_errors(self) -> list[str]:
+        """Problems with individual sheet rows: ignored, duplicate or invalid layer rows."""
+        return list(self._sheet_errors)
 
     def reload(self):
         self._load()
+
+
+if __name__ == "__main__":
+    # Batch validation: python config_reader.py [path/to/config.xlsx]
+    import sys
+    import settings
+
+    reader = ConfigReader(sys.argv[1] if len(sys.argv) > 1 else settings.EXCEL_PATH,
+                          settings.COLUMN_SCHEMA)
+    invalid = reader.get_invalid_rows()
+    sheet_errors = reader.get_sheet_errors()
+    for error in sheet_errors:
+        print(f"⚠️  {error}")
+    for record, errors in invalid:
+        print(f"❌  {record['Country']} / {record['Environment']}")
+        for error in errors:
+            print(f"      {error}")
+    print(f"{len(reader._rows) - len(invalid)} valid, {len(invalid)} invalid row(s), "
+          f"{len(sheet_errors)} sheet problem(s)")
+    sys.exit(1 if invalid or sheet_errors else 0)
@@ -0,0 +1,284 @@
+"""
+exporter.py
+Renders deployable config artifacts (JSON, YAML, dotenv or a custom text
+template) for every row of the Excel sheet, or a filtered subset.
+
+Rows are rendered in batches on a process pool with only a few batches in
+flight at a time, and artifacts are yielded in sheet order as soon as their
+batch is done, so output can be streamed to disk or into a local clone
+without holding the whole export in memory.
+
+Run:
+    python exporter.py --out build/            # write files to disk
+    python exporter.py --commit                # commit, push and open one PR per row
+    python exporter.py --out build/ --country US --env prod
+"""
+
+import json
+import os
+import re
+import string
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
+from itertools import islice
+from pathlib import Path
+from json.encoder import encode_basestring
+from typing import Iterable, Iterator
+
+from pr_creator import PRRequest, build_pr_body
+
+SKIP_KEYS = {"Country", "Environment", "BRANCH_NAME"}
+
+_BARE_VALUE = re.compile(r"[A-Za-z0-9_./:@+-]*")
+_ENV_KEY = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+
+
+@dataclass
+class Artifact:
+    country: str
+    environment: str
+    branch: str
+    path: str
+    content: str
+
+
+def _values(config: dict) -> dict:
+    return {k: v for k, v in config.items() if k not in SKIP_KEYS and v is not None}
+
+
+# Cell values repeat heavily down a sheet, so each distinct key/value line is
+# only encoded once. typed=True keeps 1, 1.0 and True apart.
+def _scalar(value) -> str:
+    """JSON encoding of a single value; also valid YAML."""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, int):
+        return str(value)
+    if isinstance(value, float):
+        return json.dumps(value)
+    return encode_basestring(str(value))
+
+
+@lru_cache(maxsize=1 << 16, typed=True)
+def _json_line(key: str, value) -> str:
+    return f"  {encode_basestring(key)}: {_scalar(value)}"
+
+
+@lru_cache(maxsize=1 << 16, typed=True)
+def _yaml_line(key: str, value) -> str:
+    # Values are flat scalars, so JSON-quoted strings are all the YAML we need.
+    # Keys are quoted too, so headers like "on", "a: b" or "# x" stay literal.
+    return f"{_scalar(str(key))}: {_scalar(value)}\n"
+
+
+@lru_cache(maxsize=1 << 16, typed=True)
+def _env_line(key: str, value) -> str:
+    if not _ENV_KEY.fullmatch(str(key)):
+        raise ValueError(f"Column {key!r} is not a valid .env variable name")
+    text = str(value)
+    if _BARE_VALUE.fullmatch(text):
+        return f"{key}={text}\n"
+    if "'" not in text:
+        # Single quotes stop dotenv loaders from expanding $VARS.
+        return f"{key}='{text}'\n"
+    escaped = json.dumps(text, ensure_ascii=False).replace("$", "\\$")
+    return f"{key}={escaped}\n"
+
+
+def render_json(config: dict, values: dict, template: dict) -> str:
+    # Same output as json.dumps(values, indent=2, ensure_ascii=False), without
+    # the pure-Python encoder that indent= falls back to.
+    if not values:
+        return "{}\n"
+    return "{\n" + ",\n".join(map(_json_line, values, values.values())) + "\n}\n"
+
+
+def render_yaml(config: dict, values: dict, template: dict) -> str:
+    return "".join(map(_yaml_line, values, values.values()))
+
+
+def render_env(config: dict, values: dict, template: dict) -> str:
+    return "".join(map(_env_line, values, values.values()))
+
+
+def render_template(config: dict, values: dict, template: dict) -> str:
+    return string.Template(template["source"]).safe_substitute(
+        {k: "" if v is None else v for k, v in config.items()}
+    )
+
+
+RENDERERS = {
+    "json": render_json,
+    "yaml": render_yaml,
+    "env": render_env,
+    "template": render_template,
+}
+
+
+def templates_for(repo: str, export_templates: dict[str, list[dict]]) -> list[dict]:
+    """
+    Picks the artifact templates for a repository (falling back to "default")
+    and reads any text template files once, up front.
+    """
+    templates = []
+    for entry in export_templates.get(repo, export_templates.get("default", [])):
+        if entry["format"] not in RENDERERS:
+            raise ValueError(f"Unknown export format: {entry['format']}")
+        entry = dict(entry)
+        if entry["format"] == "template":
+            entry["source"] = Path(entry["template"]).read_text()
+        templates.append(entry)
+    return templates
+
+
+def render_config(config: dict, templates: list[dict]) -> list[Artifact]:
+    """Renders every template for a single row."""
+    country = config.get("Country", "")
+    environment = config.get("Environment", "")
+    branch = config.get("BRANCH_NAME") or f"feature/{country.lower()}-{environment.lower()}-config"
+    values = _values(config)
+    return [
+        Artifact(
+            country=country,
+            environment=environment,
+            branch=branch,
+            path=t["path"].format(country=country, environment=environment, branch=branch),
+            content=RENDERERS[t["format"]](config, values, t),
+        )
+        for t in templates
+    ]
+
+
+def _render_batch(configs: list[dict], templates: list[dict]) -> list[tuple[dict, list[Artifact]]]:
+    return [(config, render_config(config, templates)) for config in configs]
+
+
+def export_rows(
+    configs: Iterable[dict],
+    templates: list[dict],
+    workers: int = None,
+    batch_size: int = 2000,
+) -> Iterator[tuple[dict, list[Artifact]]]:
+    """
+    Renders all rows, yielding (config, artifacts) in input order. Defaults
+    to one worker per CPU; `workers=0` (or a single CPU, or a small sheet)
+    renders in-process, where a pool would only add pickling overhead.
+    """
+    workers = (os.cpu_count() or 1) if workers is None else workers
+    configs = iter(configs)
+    first = list(islice(configs, batch_size))
+    if workers <= 1 or len(first) < batch_size:
+        yield from _render_batch(first, templates)
+        for config in configs:
+            yield config, render_config(config, templates)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # Bounded read-ahead keeps memory flat no matter how big the sheet is.
+        max_in_flight = 2 * workers
+        in_flight = deque([pool.submit(_render_batch, first, templates)])
+        while in_flight:
+            while len(in_flight) < max_in_flight:
+                batch = list(islice(configs, batch_size))
+                if not batch:
+                    break
+                in_flight.append(pool.submit(_render_batch, batch, templates))
+            yield from in_flight.popleft().result()
+
+
+def write_artifacts(artifacts: Iterable[Artifact], out_dir: str) -> int:
+    """Writes artifacts under `out_dir` as they arrive. Returns the number written."""
+    root = Path(out_dir)
+    made: set[Path] = set()
+    count = 0
+    for artifact in artifacts:
+        target = root / artifact.path
+        if target.parent not in made:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            made.add(target.parent)
+        target.write_text(artifact.content)
+        count += 1
+    return count
+
+
+def as_files(artifacts: Iterable[Artifact]) -> dict[str, str]:
+    return {a.path: a.content for a in artifacts}
+
+
+def make_pr_request(
+    config: dict,
+    artifacts: list[Artifact],
+    title_template: str,
+    sources: dict[str, str] = None,
+) -> PRRequest:
+    """The PR for one row, carrying its pre-rendered artifacts."""
+    country = config.get("Country", "")
+    environment = config.get("Environment", "")
+    branch = config.get("BRANCH_NAME") or f"feature/{country.lower()}-{environment.lower()}-config"
+    return PRRequest(
+        title=title_template.format(country=country, environment=environment),
+        body=build_pr_body(config, sources),
+        head_branch=branch,
+        base_branch="main",
+        config=config,
+        files=as_files(artifacts),
+    )
+
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+    import time
+    import settings
+    from config_reader import ConfigReader
+    from pr_creator import GitHubPRCreator
+
+    parser = argparse.ArgumentParser(description="Render config artifacts for every row.")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--out", help="directory to write artifacts to")
+    target.add_argument("--commit", action="store_true",
+                        help="commit each row's artifacts to its branch in LOCAL_CLONE_PATH, "
+                             "push them a chunk at a time and open the PRs")
+    parser.add_argument("--excel", default=settings.EXCEL_PATH)
+    parser.add_argument("--country")
+    parser.add_argument("--env")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="worker processes (0 = render in-process)")
+    args = parser.parse_args()
+
+    reader = ConfigReader(args.excel, settings.COLUMN_SCHEMA)
+    templates = templates_for(settings.GITHUB_REPO, settings.EXPORT_TEMPLATES)
+    skipped = len(reader.get_invalid_rows())
+    rows = export_rows(reader.iter_configs(args.country, args.env), templates, args.workers)
+
+    started = time.perf_counter()
+    if args.out:
+        count = write_artifacts((a for _, artifacts in rows for a in artifacts), args.out)
+        print(f"Wrote {count} artifact(s) to {args.out}", end="")
+    else:
+        if not settings.LOCAL_CLONE_PATH:
+            sys.exit("LOCAL_CLONE_PATH is not set in settings.py")
+        creator = GitHubPRCreator(
+            settings.GITHUB_TOKEN, settings.GITHUB_OWNER, settings.GITHUB_REPO,
+            settings.LOCAL_CLONE_PATH, settings.COLUMN_SCHEMA,
+        )
+        # Lazily built, so each chunk of PRs is rendered, committed and pushed
+        # before the next one is read from the sheet.
+        requests = (
+            make_pr_request(
+                config, artifacts, settings.PR_TITLE_TEMPLATE,
+                reader.get_sources(config["Country"], config["Environment"]),
+            )
+            for config, artifacts in rows
+        )
+        count = total = 0
+        for request, result in creator.iter_create_prs(requests, labels=settings.DEFAULT_LABELS):
+            total += 1
+            if result.success:
+                count += 1
+            else:
+                print(f"❌  {request.head_branch}: {result.error}")
+        print(f"Opened {count} of {total} PR(s)", end="")
+    print(f" in {time.perf_counter() - started:.2f}s ({skipped} invalid row(s) skipped)")
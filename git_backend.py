@@ -0,0 +1,167 @@
+"""
+git_backend.py
+Commits config files to many branches of a local clone using git plumbing
+(fast-import), without checking anything out, and pushes them in one go.
+
+Commits are staged under refs/pr-config-tool/ rather than refs/heads/, so the
+clone's own branches (including the checked-out one) are never touched; any
+clone of the repository can be used.
+"""
+
+import subprocess
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable
+
+STAGING_REFS = "refs/pr-config-tool"
+
+
+@dataclass
+class BranchCommit:
+    branch: str
+    files: dict[str, str]   # path → content
+    message: str
+
+
+class GitError(Exception):
+    pass
+
+
+class LocalGitBackend:
+    def __init__(self, repo_path: str, remote: str = "origin"):
+        self.repo_path = Path(repo_path)
+        self.remote = remote
+
+    def _git(self, *args: str, stdin: bytes = None) -> str:
+        proc = subprocess.run(
+            ["git", "-C", str(self.repo_path), *args],
+            input=stdin,
+            capture_output=True,
+        )
+        if proc.returncode != 0:
+            raise GitError(f"git {args[0]} failed: {proc.stderr.decode().strip()}")
+        return proc.stdout.decode()
+
+    def fetch(self):
+        self._git("fetch", "--quiet", self.remote)
+
+    def _refs(self) -> dict[str, str]:
+        out = self._git(
+            "for-each-ref", "--format=%(refname) %(objectname)",
+            "refs/heads", f"refs/remotes/{self.remote}",
+        )
+        return dict(line.split(" ", 1) for line in out.splitlines())
+
+    def _tip(self, refs: dict[str, str], branch: str) -> str | None:
+        # After fetch() the remote-tracking ref is the truth; a local head of
+        # the same name may be stale, so it is only a fallback.
+        return (
+            refs.get(f"refs/remotes/{self.remote}/{branch}")
+            or refs.get(f"refs/heads/{branch}")
+        )
+
+    def default_branch(self) -> str:
+        try:
+            ref = self._git("symbolic-ref", "--short", f"refs/remotes/{self.remote}/HEAD").strip()
+            return ref.split("/", 1)[1]
+        except GitError:
+            return "main"
+
+    def resolve_base(self, base_branch: str) -> str:
+        """Returns `base_branch` if the clone knows it, else the remote's default branch."""
+        return base_branch if self._tip(self._refs(), base_branch) else self.default_branch()
+
+    def commit_branches(self, commits: Iterable[BranchCommit], base_branch: str) -> dict[str, str]:
+        """
+        Writes one commit per branch with a single `git fast-import` run.
+        Branches that exist on the remote get the commit on top of their
+        remote-tracking tip (call fetch() first); others are started from
+        `base_branch`. Each commit is staged at refs/pr-config-tool/<branch>
+        (overwritten on every run) for push(); local branches are left
+        alone. Commits are streamed into fast-import as they are
+        produced, so `commits` can be a generator.
+        Returns {branch: commit_sha}.
+        """
+        refs = self._refs()
+        base_sha = self._tip(refs, base_branch)
+        if not base_sha:
+            raise GitError(f"Base branch '{base_branch}' not found in {self.repo_path}")
+
+        # fast-import wants "<name> <email> <epoch> <tz>", which is what git var prints.
+        try:
+            committer = self._git("var", "GIT_COMMITTER_IDENT").strip()
+        except GitError:
+            committer = f"PR Config Tool <pr-config-tool@localhost> {int(time.time())} +0000"
+
+        branches: list[str] = []
+        pending: dict[str, str] = {}
+        with tempfile.TemporaryDirectory() as tmp:
+            marks_file = Path(tmp) / "marks"
+            proc = subprocess.Popen(
+                ["git", "-C", str(self.repo_path), "fast-import", "--quiet", "--force",
+                 f"--export-marks={marks_file}"],
+                stdin=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+            )
+            try:
+                for mark, c in enumerate(commits, start=1):
+                    # A branch listed twice gets its second commit on top of the first.
+                    parent = (
+                        pending.get(c.branch)
+                        or refs.get(f"refs/remotes/{self.remote}/{c.branch}")
+                        or base_sha
+                    )
+                    pending[c.branch] = f":{mark}"
+                    branches.append(c.branch)
+                    proc.stdin.write(self._commit_command(c, mark, parent, committer))
+            except BrokenPipeError:
+                pass    # fast-import died; its stderr is reported below
+            except BaseException:
+                proc.kill()
+                proc.wait()
+                raise
+            finally:
+                proc.stdin.close()
+            stderr = proc.stderr.read()
+            if proc.wait() != 0:
+                raise GitError(f"git fast-import failed: {stderr.decode().strip()}")
+            marks = dict(line.split(" ", 1) for line in marks_file.read_text().splitlines())
+
+        return {branch: marks[f":{i}"] for i, branch in enumerate(branches, start=1)}
+
+    @staticmethod
+    def _commit_command(c: BranchCommit, mark: int, parent: str, committer: str) -> bytes:
+        message = c.message.encode()
+        out = bytearray(f"commit {STAGING_REFS}/{c.branch}\nmark :{mark}\ncommitter {committer}\n".encode())
+        out += f"data {len(message)}\n".encode() + message + b"\n"
+        out += f"from {parent}\n".encode()
+        for path, content in c.files.items():
+            data = content.encode()
+            out += f"M 100644 inline {path}\n".encode()
+            out += f"data {len(data)}\n".encode() + data + b"\n"
+        return bytes(out + b"\n")
+
+    def push(self, branches: list[str]) -> dict[str, str]:
+        """
+        Pushes the staged commits of all branches to the remote's branches
+        with a single `git push`.
+        Returns {branch: error} for every ref the remote rejected.
+        """
+        if not branches:
+            return {}
+        refspecs = [f"{STAGING_REFS}/{b}:refs/heads/{b}" for b in branches]
+        proc = subprocess.run(
+            ["git", "-C", str(self.repo_path), "push", "--porcelain", self.remote, *refspecs],
+            capture_output=True,
+        )
+        failed = {}
+        for line in proc.stdout.decode().splitlines():
+            parts = line.split("\t")
+            if len(parts) >= 3 and parts[0] == "!":
+                branch = parts[1].split(":", 1)[1].removeprefix("refs/heads/")
+                failed[branch] = parts[2]
+        if proc.returncode != 0 and not failed:
+            raise GitError(f"git push failed: {proc.stderr.decode().strip()}")
+        return failed
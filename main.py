@@ -15,6 +15,8 @@ from pathlib import Path
 import settings
 from config_reader import ConfigReader
 from pr_creator import GitHubPRCreator, build_pr_body
+from pr_dashboard import PRDashboard, PRStatus
+from exporter import Artifact, make_pr_request, render_config, templates_for
 
 # ── Colour palette ─────────────────────────────────────────────────────────────
 BG        = "#F0F4F8"
@@ -48,6 +50,9 @@ class PRConfigApp(tk.Tk):
 
         self._reader: ConfigReader | None = None
         self._config: dict | None = None
+        self._errors: list[str] = []
+        self._sources: dict[str, str] = {}
+        self._artifacts: list[Artifact] = []
 
         self._load_reader(settings.EXCEL_PATH)
         self._build_ui()
@@ -56,9 +61,18 @@ class PRConfigApp(tk.Tk):
 
     def _load_reader(self, path: str):
         try:
-            self._reader = ConfigReader(path)
+            self._reader = ConfigReader(path, settings.COLUMN_SCHEMA)
         except Exception as e:
             messagebox.showerror("Excel Error", str(e))
+            return
+        self._warn_sheet_errors()
+
+    def _warn_sheet_errors(self):
+        problems = self._reader.get_sheet_errors()
+        if problems:
+            listed = "\n".join(f"• {p}" for p in problems[:10])
+            more = f"\n…and {len(problems) - 10} more" if len(problems) > 10 else ""
+            messagebox.showwarning("Excel Rows Ignored", f"{listed}{more}")
 
     # ── UI Construction ───────────────────────────────────────────────────────
 
@@ -252,6 +266,21 @@ class PRConfigApp(tk.Tk):
         )
         self._refresh_btn.pack(side="right", padx=(0, 10))
 
+        self._dashboard_btn = tk.Button(
+            action_bar,
+            text="📊  PR Dashboard",
+            font=("Segoe UI", 10),
+            bg=CARD,
+            fg=TEXT,
+            relief="flat",
+            bd=1,
+            padx=16,
+            pady=10,
+            cursor="hand2",
+            command=self._open_dashboard,
+        )
+        self._dashboard_btn.pack(side="right", padx=(0, 10))
+
         # Scroll area for config preview
         scroll_frame = tk.Frame(content, bg=BG)
         scroll_frame.pack(fill="both", expand=True, padx=20, pady=(12, 0))
@@ -369,9 +398,14 @@ class PRConfigApp(tk.Tk):
         if self._reader:
             try:
                 self._reader.reload()
+                self._warn_sheet_errors()
                 self._populate_countries()
                 self._clear_preview()
-                self._set_status("✅ Excel reloaded successfully")
+                invalid = len(self._reader.get_invalid_rows())
+                if invalid:
+                    self._set_status(f"⚠️  Excel reloaded — {invalid} row(s) failed validation")
+                else:
+                    self._set_status("✅ Excel reloaded successfully")
             except Exception as e:
                 messagebox.showerror("Reload Error", str(e))
 
@@ -393,12 +427,30 @@ class PRConfigApp(tk.Tk):
         if not self._config:
             messagebox.showwarning("Not Found", f"No config for {country} / {env}")
             return
+        self._errors  = self._reader.get_errors(country, env)
+        self._sources = self._reader.get_sources(country, env)
+        render_error = ""
+        try:
+            templates = templates_for(self._repo_var.get().strip(), settings.EXPORT_TEMPLATES)
+            self._artifacts = render_config(self._config, templates)
+        except Exception as e:
+            self._artifacts = []
+            render_error = str(e)
+            messagebox.showwarning("Export Error", f"Could not render config artifacts:\n{e}")
 
         self._refresh_table()
         self._refresh_pr_preview()
         self._update_header(country, env)
-        self._pr_btn.config(state="normal")
-        self._set_status(f"Loaded config: {country} / {env}")
+        if self._errors:
+            self._pr_btn.config(state="disabled")
+            self._set_status(f"❌  {country} / {env} has {len(self._errors)} validation error(s)")
+        elif render_error:
+            # A PR without its artifacts would look complete but ship nothing.
+            self._pr_btn.config(state="disabled")
+            self._set_status(f"❌  {country} / {env}: config artifacts could not be rendered")
+        else:
+            self._pr_btn.config(state="normal")
+            self._set_status(f"Loaded config: {country} / {env}")
 
     def _refresh_table(self):
         for row in self._tree.get_children():
@@ -406,13 +458,15 @@ class PRConfigApp(tk.Tk):
         if not self._config:
             return
         skip = {"Country", "Environment", "BRANCH_NAME"}
+        bad_keys = {e.split(":", 1)[0] for e in self._errors}
         for i, (k, v) in enumerate(self._config.items()):
-            if k in skip:
+            if k in skip and k not in bad_keys:
                 continue
-            tag = "even" if i % 2 == 0 else "odd"
+            tag = "invalid" if k in bad_keys else "even" if i % 2 == 0 else "odd"
             self._tree.insert("", "end", values=(k, v if v is not None else "—"), tags=(tag,))
         self._tree.tag_configure("even", background="#F8FAFC")
         self._tree.tag_configure("odd",  background=CARD)
+        self._tree.tag_configure("invalid", background="#FEE2E2", foreground=DANGER)
 
     def _refresh_pr_preview(self):
         if not self._config:
@@ -420,11 +474,17 @@ class PRConfigApp(tk.Tk):
         country = self._config.get("Country", "")
         env     = self._config.get("Environment", "")
         title   = settings.PR_TITLE_TEMPLATE.format(country=country, environment=env)
-        body    = build_pr_body(self._config)
+        body    = build_pr_body(self._config, self._sources)
 
         self._pr_preview.config(state="normal")
         self._pr_preview.delete("1.0", "end")
+        if self._errors:
+            problems = "\n".join(f"  • {e}" for e in self._errors)
+            self._pr_preview.insert("end", f"VALIDATION ERRORS:\n{problems}\n\n{'─'*40}\n\n")
         self._pr_preview.insert("end", f"TITLE:\n{title}\n\n{'─'*40}\n\nBODY:\n{body}")
+        if self._artifacts:
+            files = "\n".join(f"  • {a.path}" for a in self._artifacts)
+            self._pr_preview.insert("end", f"\n{'─'*40}\n\nFILES:\n{files}\n")
         self._pr_preview.config(state="disabled")
 
     def _update_header(self, country: str, env: str):
@@ -443,49 +503,68 @@ class PRConfigApp(tk.Tk):
         self._header_label.config(text="Select a country and environment to begin")
         self._env_badge.config(text="", bg=CARD)
         self._config = None
+        self._errors = []
+        self._sources = {}
+        self._artifacts = []
 
     def _set_status(self, msg: str):
         self._status_var.set(msg)
 
     # ── PR Creation ───────────────────────────────────────────────────────────
 
-    def _create_pr(self):
-        if not self._config:
-            return
-
+    def _github_settings(self) -> tuple[str, str, str] | None:
         token = self._token_var.get().strip()
         owner = self._owner_var.get().strip()
         repo  = self._repo_var.get().strip()
 
         if not token or token.startswith("ghp_YOUR"):
             messagebox.showerror("Missing Token", "Please enter a valid GitHub Personal Access Token.")
-            return
+            return None
         if not owner or not repo:
             messagebox.showerror("Missing Repo", "Please enter the GitHub owner and repository name.")
+            return None
+        return token, owner, repo
+
+    def _create_pr(self):
+        if not self._config:
             return
 
-        country = self._config.get("Country", "")
-        env     = self._config.get("Environment", "")
-        branch  = self._config.get("BRANCH_NAME") or f"feature/{country.lower()}-{env.lower()}-config"
-        title   = settings.PR_TITLE_TEMPLATE.format(country=country, environment=env)
-        body    = build_pr_body(self._config)
+        github = self._github_settings()
+        if not github:
+            return
+        token, owner, repo = github
+
+        # Reuses the artifacts rendered when the row was selected.
+        request = make_pr_request(
+            self._config, self._artifacts, settings.PR_TITLE_TEMPLATE, self._sources,
+        )
 
         self._pr_btn.config(state="disabled", text="⏳  Creating PR…")
         self._set_status("Creating Pull Request on GitHub…")
 
         def worker():
-            creator = GitHubPRCreator(token, owner, repo)
+            creator = GitHubPRCreator(
+                token, owner, repo, settings.LOCAL_CLONE_PATH or None, settings.COLUMN_SCHEMA,
+            )
             result  = creator.create_pr(
-                title=title,
-                body=body,
-                head_branch=branch,
-                base_branch="main",
+                title=request.title,
+                body=request.body,
+                head_branch=request.head_branch,
+                base_branch=request.base_branch,
                 labels=settings.DEFAULT_LABELS,
+                config=request.config,
+                files=request.files,
             )
             self.after(0, lambda: self._on_pr_done(result))
 
         threading.Thread(target=worker, daemon=True).start()
 
+    def _open_dashboard(self):
+        github = self._github_settings()
+        if not github:
+            return
+        PRDashboardWindow(self, GitHubPRCreator(*github))
+
     def _on_pr_done(self, result):
         self._pr_btn.config(state="normal", text="🚀  Create Pull Request")
         if result.success:
@@ -503,6 +582,88 @@ class PRConfigApp(tk.Tk):
             messagebox.showerror("PR Creation Failed", result.error)
 
 
+class PRDashboardWindow(tk.Toplevel):
+    """Live table of every labelled PR; only rows that changed are redrawn."""
+
+    STATE_COLORS = {"open": SUCCESS, "merged": "#7C3AED", "closed": DANGER}
+
+    def __init__(self, master, creator: GitHubPRCreator):
+        super().__init__(master)
+        self.title("PR Dashboard")
+        self.geometry("900x500")
+        self.configure(bg=BG)
+
+        self._dashboard = PRDashboard(creator, settings.DEFAULT_LABELS)
+        self._polling = False
+
+        cols = ("PR", "State", "CI", "Branch", "Title")
+        self._tree = ttk.Treeview(
+            self, columns=cols, show="headings", style="Config.Treeview",
+        )
+        for c, width in zip(cols, (70, 80, 80, 260, 380)):
+            self._tree.heading(c, text=c)
+            self._tree.column(c, anchor="w", width=width)
+        for state, color in self.STATE_COLORS.items():
+            self._tree.tag_configure(state, foreground=color)
+        self._tree.bind("<Double-1>", self._open_selected)
+
+        vsb = ttk.Scrollbar(self, orient="vertical", command=self._tree.yview)
+        self._tree.configure(yscrollcommand=vsb.set)
+
+        self._status_var = tk.StringVar(value="Loading PRs…")
+        tk.Label(
+            self, textvariable=self._status_var,
+            font=("Segoe UI", 9), bg=CARD, fg=MUTED, anchor="w",
+        ).pack(side="bottom", fill="x", ipady=6, ipadx=16)
+        self._tree.pack(side="left", fill="both", expand=True, padx=(16, 0), pady=16)
+        vsb.pack(side="right", fill="y", padx=(0, 16), pady=16)
+
+        self._poll()
+
+    def _poll(self):
+        if not self.winfo_exists() or self._polling:
+            return
+        self._polling = True
+
+        def worker():
+            self._dashboard.requests_made = 0
+            try:
+                changed, error = self._dashboard.poll(), ""
+            except Exception as e:
+                changed, error = {}, str(e)
+            self.after(0, lambda: self._on_poll_done(changed, error))
+
+        threading.Thread(target=worker, daemon=True).start()
+
+    def _on_poll_done(self, changed: dict[int, PRStatus], error: str):
+        if not self.winfo_exists():
+            return
+        self._polling = False
+        for number, status in changed.items():
+            iid = str(number)
+            values = (f"#{number}", status.state, status.ci or "—", status.branch, status.title)
+            if self._tree.exists(iid):
+                self._tree.item(iid, values=values, tags=(status.state,))
+            else:
+                self._tree.insert("", 0, iid=iid, values=values, tags=(status.state,))
+
+        if error:
+            self._status_var.set(f"❌  Poll failed: {error}")
+        else:
+            self._status_var.set(
+                f"{len(self._dashboard.prs)} PR(s) · {len(changed)} changed · "
+                f"{self._dashboard.requests_made} request(s) · next poll in {settings.DASHBOARD_POLL_SECONDS}s"
+            )
+        self.after(settings.DASHBOARD_POLL_SECONDS * 1000, self._poll)
+
+    def _open_selected(self, _event=None):
+        for iid in self._tree.selection():
+            status = self._dashboard.prs.get(int(iid))
+            if status:
+                import webbrowser
+                webbrowser.open(status.url)
+
+
 if __name__ == "__main__":
     app = PRConfigApp()
     app.mainloop()
@@ -4,9 +4,15 @@ Creates GitHub Pull Requests using the GitHub REST API (no third-party SDK neede
 """
 
 import json
+import urllib.parse
 import urllib.request
 import urllib.error
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from itertools import islice
+from typing import Iterable, Iterator
+
+from git_backend import BranchCommit, LocalGitBackend
+from schema import compile_schema, validate_row
 
 
 @dataclass
@@ -17,13 +23,47 @@ class PRResult:
     error: str = ""
 
 
+@dataclass
+class PRRequest:
+    title: str
+    body: str
+    head_branch: str
+    base_branch: str
+    # The Excel row behind the PR; checked against the creator's schema.
+    config: dict | None = None
+    # Pre-rendered artifacts (path → content) committed alongside the PR body.
+    files: dict[str, str] = field(default_factory=dict)
+
+
 class GitHubPRCreator:
     BASE_URL = "https://api.github.com"
 
-    def __init__(self, token: str, owner: str, repo: str):
+    def __init__(
+        self,
+        token: str,
+        owner: str,
+        repo: str,
+        local_clone: str = None,
+        schema: dict = None,
+    ):
         self.token = token
         self.owner = owner
         self.repo = repo
+        # With a schema, every PR must come with its config row, and rows that
+        # fail validation are refused here rather than trusted to the caller.
+        self._validators = compile_schema(schema) if schema else {}
+        # When set, branches and commits are written to this clone and pushed,
+        # and the REST API is only used to open the PRs.
+        self.local = LocalGitBackend(local_clone) if local_clone else None
+
+    def _headers(self) -> dict:
+        return {
+            "Authorization": f"Bearer {self.token}",
+            "Accept": "application/vnd.github+json",
+            "X-GitHub-Api-Version": "2022-11-28",
+            "Content-Type": "application/json",
+            "User-Agent": "PR-Config-Tool/1.0",
+        }
 
     def _request(self, method: str, endpoint: str, body: dict = None) -> dict:
         url = f"{self.BASE_URL}{endpoint}"
@@ -33,17 +73,39 @@ class GitHubPRCreator:
             url,
             data=data,
             method=method,
-            headers={
-                "Authorization": f"Bearer {self.token}",
-                "Accept": "application/vnd.github+json",
-                "X-GitHub-Api-Version": "2022-11-28",
-                "Content-Type": "application/json",
-                "User-Agent": "PR-Config-Tool/1.0",
-            },
+            headers=self._headers(),
         )
         with urllib.request.urlopen(req) as resp:
             return json.loads(resp.read())
 
+    def get_conditional(self, endpoint: str, etag: str = "") -> tuple[object | None, str, str]:
+        """
+        GET with If-None-Match. Returns (data, etag, next_page). `data` is None
+        when GitHub answers 304 Not Modified, which does not count against the
+        rate limit. `next_page` is the rel="next" URL from the Link header, or "".
+        """
+        url = endpoint if endpoint.startswith("http") else f"{self.BASE_URL}{endpoint}"
+        headers = self._headers()
+        if etag:
+            headers["If-None-Match"] = etag
+
+        req = urllib.request.Request(url, method="GET", headers=headers)
+        try:
+            with urllib.request.urlopen(req) as resp:
+                data = json.loads(resp.read())
+                new_etag = resp.headers.get("ETag", "")
+                link = resp.headers.get("Link", "")
+        except urllib.error.HTTPError as e:
+            if e.code == 304:
+                return None, etag, ""
+            raise
+
+        next_page = ""
+        for part in link.split(","):
+            if 'rel="next"' in part:
+                next_page = part[part.index("<") + 1:part.index(">")]
+        return data, new_etag, next_page
+
     def get_default_branch(self) -> str:
         data = self._request("GET", f"/repos/{self.owner}/{self.repo}")
         return data.get("default_branch", "main")
@@ -57,6 +119,12 @@ class GitHubPRCreator:
                 return False
             raise
 
+    def find_open_pr(self, head_branch: str) -> dict | None:
+        """The open PR whose head is `head_branch`, if there is one."""
+        head = urllib.parse.quote(f"{self.owner}:{head_branch}")
+        pulls = self._request("GET", f"/repos/{self.owner}/{self.repo}/pulls?head={head}&state=open")
+        return pulls[0] if pulls else None
+
     def create_branch(self, new_branch: str, base_branch: str):
         ref_data = self._request(
             "GET", f"/repos/{self.owner}/{self.repo}/git/ref/heads/{base_branch}"
@@ -99,6 +167,34 @@ class GitHubPRCreator:
 
         self._request("PUT", endpoint, payload)
 
+    def commit_files(self, branch: str, files: dict[str, str], commit_message: str) -> str:
+        """
+        Commits every file to `branch` as a single commit through the git data
+        API (tree → commit → ref update). Returns the new commit SHA.
+        """
+        repo = f"/repos/{self.owner}/{self.repo}"
+        parent = self._request("GET", f"{repo}/git/ref/heads/{branch}")["object"]["sha"]
+        base_tree = self._request("GET", f"{repo}/git/commits/{parent}")["tree"]["sha"]
+        # Inline content lets GitHub create the blobs as part of the tree.
+        tree = self._request(
+            "POST",
+            f"{repo}/git/trees",
+            {
+                "base_tree": base_tree,
+                "tree": [
+                    {"path": path, "mode": "100644", "type": "blob", "content": content}
+                    for path, content in files.items()
+                ],
+            },
+        )
+        commit = self._request(
+            "POST",
+            f"{repo}/git/commits",
+            {"message": commit_message, "tree": tree["sha"], "parents": [parent]},
+        )
+        self._request("PATCH", f"{repo}/git/refs/heads/{branch}", {"sha": commit["sha"]})
+        return commit["sha"]
+
     def create_pr(
         self,
         title: str,
@@ -106,7 +202,31 @@ class GitHubPRCreator:
         head_branch: str,
         base_branch: str,
         labels: list[str] = None,
+        config: dict = None,
+        files: dict[str, str] = None,
     ) -> PRResult:
+        # Never push a row that failed schema validation
+        errors = self._validate(config)
+        if errors:
+            return _validation_failure(errors)
+
+        # A branch with an open PR belongs to another row (or an earlier run);
+        # committing onto it would slip this row's files into that PR.
+        try:
+            existing = self.find_open_pr(head_branch)
+        except Exception as e:
+            return _error_result(e)
+        if existing:
+            return PRResult(
+                success=False,
+                error=f"Branch {head_branch} already has an open PR: #{existing['number']} "
+                      f"{existing['title']} ({existing['html_url']})",
+            )
+
+        if self.local:
+            request = PRRequest(title, body, head_branch, base_branch, config, files or {})
+            return self.create_prs([request], labels=labels)[0]
+
         try:
             # Ensure base branch exists
             default_branch = self.get_default_branch()
@@ -116,59 +236,176 @@ class GitHubPRCreator:
             if not self.branch_exists(head_branch):
                 self.create_branch(head_branch, actual_base)
 
-            # Write config file to the branch
-            config_content = f"# Auto-generated config\n# Title: {title}\n\n{body}"
-            self.update_or_create_file(
-                branch=head_branch,
-                file_path=f"configs/{head_branch.replace('/', '_')}.md",
-                content=config_content,
-                commit_message=f"chore: add config for {title}",
-            )
+            # Write config files to the branch, all in one commit
+            commit = _config_commit(title, body, head_branch, files)
+            self.commit_files(head_branch, commit.files, commit.message)
+
+            return self._open_pr(title, body, head_branch, actual_base, labels)
+
+        except Exception as e:
+            return _error_result(e)
 
-            # Open the PR
-            payload = {
-                "title": title,
-                "body": body,
-                "head": head_branch,
-                "base": actual_base,
-                "draft": False,
-            }
-            pr_data = self._request(
+    def create_prs(self, requests: Iterable[PRRequest], labels: list[str] = None) -> list[PRResult]:
+        """Like iter_create_prs, but returns one PRResult per request, in order."""
+        return [result for _, result in self.iter_create_prs(requests, labels)]
+
+    def iter_create_prs(
+        self,
+        requests: Iterable[PRRequest],
+        labels: list[str] = None,
+        chunk_size: int = 500,
+    ) -> Iterator[tuple[PRRequest, PRResult]]:
+        """
+        Bulk rollout through the local clone. Requests are taken `chunk_size`
+        at a time: the chunk's commits are streamed into one fast-import run
+        per base branch, its branches go up in a single `git push`, and its PRs
+        are opened before the next chunk is read. `requests` can be a
+        generator, so only one chunk is ever held in memory.
+        Yields (request, result) in input order.
+        """
+        if not self.local:
+            raise ValueError("create_prs needs a local clone (pass local_clone=...)")
+
+        requests = iter(requests)
+        claimed: dict[str, str] = {}    # branch → title of the request that took it
+        bases: dict[str, str] = {}      # requested base → resolved base
+        fetched = False
+        while chunk := list(islice(requests, chunk_size)):
+            results: list[PRResult | None] = [None] * len(chunk)
+            pending = []
+            for i, r in enumerate(chunk):
+                errors = self._validate(r.config)
+                if errors:
+                    results[i] = _validation_failure(errors)
+                elif r.head_branch in claimed:
+                    # Two rows resolving to one branch would end up in a single
+                    # PR; the first row keeps the branch.
+                    results[i] = PRResult(
+                        success=False,
+                        error=f"Branch {r.head_branch} is already used by {claimed[r.head_branch]}",
+                    )
+                else:
+                    claimed[r.head_branch] = r.title
+                    pending.append(r)
+
+            rejected: dict[str, str] = {}
+            if pending:
+                try:
+                    if not fetched:
+                        self.local.fetch()
+                        fetched = True
+                    for r in pending:
+                        if r.base_branch not in bases:
+                            bases[r.base_branch] = self.local.resolve_base(r.base_branch)
+                    for base in dict.fromkeys(bases[r.base_branch] for r in pending):
+                        self.local.commit_branches(
+                            (
+                                _config_commit(r.title, r.body, r.head_branch, r.files)
+                                for r in pending
+                                if bases[r.base_branch] == base
+                            ),
+                            base,
+                        )
+                    rejected = self.local.push([r.head_branch for r in pending])
+                except Exception as e:
+                    error = _error_result(e)
+                    results = [result or error for result in results]
+
+            for r, result in zip(chunk, results):
+                if result is None:
+                    if r.head_branch in rejected:
+                        result = PRResult(
+                            success=False,
+                            error=f"git push rejected {r.head_branch}: {rejected[r.head_branch]}",
+                        )
+                    else:
+                        try:
+                            result = self._open_pr(r.title, r.body, r.head_branch, bases[r.base_branch], labels)
+                        except Exception as e:
+                            result = _error_result(e)
+                yield r, result
+
+    def _validate(self, config: dict | None) -> list[str]:
+        if not self._validators:
+            return []
+        if config is None:
+            return ["no config row was supplied to validate"]
+        return validate_row(config, self._validators)
+
+    def _open_pr(
+        self,
+        title: str,
+        body: str,
+        head_branch: str,
+        base_branch: str,
+        labels: list[str] = None,
+    ) -> PRResult:
+        payload = {
+            "title": title,
+            "body": body,
+            "head": head_branch,
+            "base": base_branch,
+            "draft": False,
+        }
+        pr_data = self._request(
+            "POST",
+            f"/repos/{self.owner}/{self.repo}/pulls",
+            payload,
+        )
+
+        # Apply labels if any
+        if labels:
+            self._request(
                 "POST",
-                f"/repos/{self.owner}/{self.repo}/pulls",
-                payload,
+                f"/repos/{self.owner}/{self.repo}/issues/{pr_data['number']}/labels",
+                {"labels": labels},
             )
 
-            # Apply labels if any
-            if labels:
-                self._request(
-                    "POST",
-                    f"/repos/{self.owner}/{self.repo}/issues/{pr_data['number']}/labels",
-                    {"labels": labels},
-                )
+        return PRResult(
+            success=True,
+            pr_url=pr_data["html_url"],
+            pr_number=pr_data["number"],
+        )
 
-            return PRResult(
-                success=True,
-                pr_url=pr_data["html_url"],
-                pr_number=pr_data["number"],
-            )
 
-        except urllib.error.HTTPError as e:
-            error_body = e.read().decode()
-            try:
-                msg = json.loads(error_body).get("message", error_body)
-            except Exception:
-                msg = error_body
-            return PRResult(success=False, error=f"GitHub API error {e.code}: {msg}")
-        except Exception as e:
-            return PRResult(success=False, error=str(e))
+def _config_commit(title: str, body: str, head_branch: str, files: dict[str, str] = None) -> BranchCommit:
+    """The config files committed alongside every PR: the markdown summary plus any artifacts."""
+    summary = {f"configs/{head_branch.replace('/', '_')}.md": f"# Auto-generated config\n# Title: {title}\n\n{body}"}
+    return BranchCommit(
+        branch=head_branch,
+        files={**summary, **(files or {})},
+        message=f"chore: add config for {title}",
+    )
+
+
+def _validation_failure(errors: list[str]) -> PRResult:
+    return PRResult(
+        success=False,
+        error="Config failed validation:\n" + "\n".join(errors),
+    )
+
+
+def _error_result(e: Exception) -> PRResult:
+    if isinstance(e, urllib.error.HTTPError):
+        error_body = e.read().decode()
+        try:
+            msg = json.loads(error_body).get("message", error_body)
+        except Exception:
+            msg = error_body
+        return PRResult(success=False, error=f"GitHub API error {e.code}: {msg}")
+    return PRResult(success=False, error=str(e))
 
 
-def build_pr_body(config: dict) -> str:
-    """Formats the Excel config row into a nice PR description."""
+def build_pr_body(config: dict, sources: dict[str, str] = None) -> str:
+    """
+    Formats the Excel config row into a nice PR description.
+    If `sources` is given (key → layer name), a column shows where each value came from.
+    """
     skip = {"Country", "Environment", "BRANCH_NAME"}
+    header = "| Key | Value |" + (" Layer |" if sources else "")
+    divider = "|-----|-------|" + ("-------|" if sources else "")
     rows = "\n".join(
-        f"| `{k}` | `{v}` |"
+        f"| `{k}` | `{v}` |" + (f" {sources.get(k, '')} |" if sources else "")
         for k, v in config.items()
         if k not in skip and v is not None
     )
@@ -181,8 +418,8 @@ This PR was auto-generated by the **PR Config Tool**.
 
 ### 📋 Configuration Values
 
-| Key | Value |
-|-----|-------|
+{header}
+{divider}
 {rows}
 
 ---
@@ -0,0 +1,181 @@
+"""
+pr_dashboard.py
+Tracks the state (open / merged / closed) and CI result of every PR carrying
+the tool's labels, polling GitHub incrementally.
+
+Each poll streams the issues listing filtered by the tool's labels with a
+`since` cursor, so only labelled PRs updated since the previous poll come back,
+and only those are looked up individually for their head branch and SHA. Every
+request carries its ETag, so an unchanged listing costs a single 304. A PR
+whose labels are removed drops out of the listing and keeps its last state. CI results come from
+three searches (status:success / failure / pending) covering every open PR at
+once, so a poll costs a handful of requests however many PRs are tracked.
+
+Run:
+    python pr_dashboard.py            # print the current state once
+    python pr_dashboard.py --watch    # keep polling, print only changes
+"""
+
+import urllib.parse
+from dataclasses import dataclass
+from typing import Iterator
+
+from pr_creator import GitHubPRCreator
+
+CI_STATES = ("success", "failure", "pending")
+
+
+@dataclass
+class PRStatus:
+    number: int
+    title: str
+    branch: str
+    state: str          # open / merged / closed
+    ci: str             # success / failure / pending / "" (no checks yet)
+    url: str
+    head_sha: str
+    updated_at: str
+
+
+class PRDashboard:
+    def __init__(self, creator: GitHubPRCreator, labels: list[str]):
+        self.creator = creator
+        self.labels = set(labels)
+        self.prs: dict[int, PRStatus] = {}
+        self.requests_made = 0
+        self._cursor = ""                   # newest updated_at seen so far
+        self._etags: dict[str, str] = {}    # endpoint → ETag
+        self._listing_pages: list[str] = [] # pages of the current listing, first page first
+        self._ci_buckets: dict[str, tuple[set[int], str]] = {}  # endpoint → (PR numbers, next page)
+
+    def _get(self, endpoint: str) -> tuple[object | None, str]:
+        data, etag, next_page = self.creator.get_conditional(endpoint, self._etags.get(endpoint, ""))
+        self.requests_made += 1
+        if etag:
+            self._etags[endpoint] = etag
+        return data, next_page
+
+    def iter_updated_pulls(self) -> Iterator[dict]:
+        """
+        Streams labelled PRs updated since the last poll, one page at a time,
+        as issue objects (GitHub models every PR as an issue too, and only the
+        issues endpoint can filter by label and `since`).
+        """
+        params = {
+            "labels": ",".join(sorted(self.labels)),
+            "state": "all",
+            "sort": "updated",
+            "direction": "asc",
+            "per_page": "100",
+        }
+        if self._cursor:
+            params["since"] = self._cursor
+        endpoint = (
+            f"/repos/{self.creator.owner}/{self.creator.repo}/issues?"
+            + urllib.parse.urlencode(params, safe=",:")
+        )
+        if self._listing_pages and self._listing_pages[0] != endpoint:
+            # The cursor moved, so the old pages' URLs will never be asked for again.
+            for url in self._listing_pages:
+                self._etags.pop(url, None)
+            self._listing_pages = []
+        while endpoint:
+            if endpoint not in self._listing_pages:
+                self._listing_pages.append(endpoint)
+            page, endpoint = self._get(endpoint)
+            if page is None:
+                # 304: same cursor, same results; nothing changed.
+                return
+            for issue in page:
+                if "pull_request" in issue:
+                    yield issue
+
+    def _ci_states(self) -> dict[int, str]:
+        """
+        CI result of every open labelled PR, from one search per result
+        (plus pagination) instead of one request per PR. Each bucket is
+        remembered so a 304 can reuse it.
+        """
+        labels = " ".join(f'label:"{label}"' for label in sorted(self.labels))
+        states: dict[int, str] = {}
+        for ci in CI_STATES:
+            query = f"repo:{self.creator.owner}/{self.creator.repo} is:pr is:open {labels} status:{ci}"
+            endpoint = f"/search/issues?q={urllib.parse.quote(query)}&per_page=100"
+            numbers: set[int] = set()
+            while endpoint:
+                data, next_page = self._get(endpoint)
+                if data is not None:
+                    self._ci_buckets[endpoint] = ({item["number"] for item in data["items"]}, next_page)
+                page_numbers, next_page = self._ci_buckets.get(endpoint, (set(), ""))
+                numbers |= page_numbers
+                endpoint = next_page
+            states.update(dict.fromkeys(numbers, ci))
+        return states
+
+    def poll(self) -> dict[int, PRStatus]:
+        """Brings `prs` up to date and returns only the PRs that changed."""
+        changed: dict[int, PRStatus] = {}
+        newest = self._cursor
+
+        for issue in self.iter_updated_pulls():
+            newest = max(newest, issue["updated_at"])
+            number = issue["number"]
+            previous = self.prs.get(number)
+            if previous and previous.updated_at == issue["updated_at"]:
+                continue    # returned again because `since` is inclusive
+
+            # Branch and head SHA are only on the PR itself.
+            pr, _ = self._get(f"/repos/{self.creator.owner}/{self.creator.repo}/pulls/{number}")
+            head = pr["head"] if pr else {"ref": previous.branch, "sha": previous.head_sha}
+            status = PRStatus(
+                number=number,
+                title=issue["title"],
+                branch=head["ref"],
+                state="merged" if issue["pull_request"].get("merged_at") else issue["state"],
+                # Keep the known CI result unless new commits were pushed.
+                ci=previous.ci if previous and previous.head_sha == head["sha"] else "",
+                url=issue["html_url"],
+                head_sha=head["sha"],
+                updated_at=issue["updated_at"],
+            )
+            self.prs[number] = status
+            if status != previous:
+                changed[number] = status
+
+        self._cursor = newest
+
+        if any(status.state == "open" for status in self.prs.values()):
+            ci_states = self._ci_states()
+            for status in self.prs.values():
+                ci = ci_states.get(status.number, "") if status.state == "open" else status.ci
+                if ci != status.ci:
+                    status.ci = ci
+                    changed[status.number] = status
+
+        return changed
+
+
+def _format(status: PRStatus) -> str:
+    return f"#{status.number:<6} {status.state:<7} ci:{status.ci or '—':<8} {status.branch:<40} {status.url}"
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+    import settings
+
+    creator = GitHubPRCreator(settings.GITHUB_TOKEN, settings.GITHUB_OWNER, settings.GITHUB_REPO)
+    dashboard = PRDashboard(creator, settings.DEFAULT_LABELS)
+
+    dashboard.poll()
+    for status in sorted(dashboard.prs.values(), key=lambda s: s.number):
+        print(_format(status))
+    print(f"{len(dashboard.prs)} PR(s), {dashboard.requests_made} request(s)")
+
+    if "--watch" in sys.argv:
+        while True:
+            time.sleep(settings.DASHBOARD_POLL_SECONDS)
+            dashboard.requests_made = 0
+            for status in dashboard.poll().values():
+                print(_format(status))
+            print(f"— polled with {dashboard.requests_made} request(s)")
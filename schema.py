@@ -0,0 +1,122 @@
+"""
+schema.py
+Compiles the column schema from settings.py into fast per-column validators
+and runs them across every row of the Excel sheet.
+"""
+
+import re
+from typing import Any, Callable
+
+# A validator takes a single cell value and returns an error message or None.
+Validator = Callable[[Any], str | None]
+
+URL_PATTERN = r"https?://[^\s/$.?#][^\s]*"
+
+
+def _is_missing(value) -> bool:
+    return value is None or (isinstance(value, str) and not value.strip())
+
+
+def _as_number(value, integer: bool):
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, int):
+        return value
+    if isinstance(value, float):
+        if integer and not value.is_integer():
+            return None
+        return int(value) if integer else value
+    if isinstance(value, str):
+        try:
+            return int(value.strip()) if integer else float(value.strip())
+        except ValueError:
+            return None
+    return None
+
+
+def compile_rule(column: str, rule: dict) -> Validator:
+    """Turns one schema entry into a single closure. Regexes are compiled here, once."""
+    kind     = rule.get("type", "str")
+    required = rule.get("required", False)
+    choices  = set(rule["choices"]) if "choices" in rule else None
+    low      = rule.get("min")
+    high     = rule.get("max")
+
+    pattern = rule.get("pattern")
+    if kind == "url" and pattern is None:
+        pattern = URL_PATTERN
+    matcher = re.compile(pattern).fullmatch if pattern else None
+
+    checks: list[Callable[[Any], str | None]] = []
+
+    if kind in ("int", "float"):
+        integer = kind == "int"
+
+        def check_number(value):
+            number = _as_number(value, integer)
+            if number is None:
+                return f"expected {'an integer' if integer else 'a number'}, got {value!r}"
+            if low is not None and number < low:
+                return f"{number} is below the minimum of {low}"
+            if high is not None and number > high:
+                return f"{number} is above the maximum of {high}"
+            return None
+
+        checks.append(check_number)
+
+    if matcher:
+        def check_pattern(value):
+            if not matcher(str(value).strip()):
+                what = "a valid URL" if kind == "url" else f"a match for /{pattern}/"
+                return f"expected {what}, got {value!r}"
+            return None
+
+        checks.append(check_pattern)
+
+    if choices:
+        def check_choices(value):
+            if value not in choices:
+                return f"{value!r} is not one of {sorted(choices)}"
+            return None
+
+        checks.append(check_choices)
+
+    def validate(value) -> str | None:
+        if _is_missing(value):
+            return f"{column}: is required" if required else None
+        for check in checks:
+            error = check(value)
+            if error:
+                return f"{column}: {error}"
+        return None
+
+    return validate
+
+
+def compile_schema(schema: dict[str, dict]) -> dict[str, Validator]:
+    return {column: compile_rule(column, rule) for column, rule in schema.items()}
+
+
+def validate_rows(rows: list[dict], validators: dict[str, Validator]) -> dict[int, list[str]]:
+    """
+    Validates all rows column by column and returns {row_index: [errors]} for
+    the rows that failed. Each distinct value in a column is only checked once,
+    since most columns repeat the same handful of values down the sheet.
+    """
+    errors: dict[int, list[str]] = {}
+    for column, validate in validators.items():
+        # Keyed on type too, so True, 1 and 1.0 are each checked on their own.
+        values = [(type(v), v) for v in (r.get(column) for r in rows)]
+        results = {key: validate(key[1]) for key in set(values)}
+        failed = {key for key, err in results.items() if err}
+        if not failed:
+            continue
+        for i, key in enumerate(values):
+            if key in failed:
+                errors.setdefault(i, []).append(results[key])
+    return errors
+
+
+def validate_row(record: dict, validators: dict[str, Validator]) -> list[str]:
+    """Errors for a single row, in schema order."""
+    return [err for column, validate in validators.items() if (err := validate(record.get(column)))]
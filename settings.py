@@ -12,6 +12,12 @@ GITHUB_TOKEN = "ghp_YOUR_TOKEN_HERE"
 GITHUB_OWNER = "your-org"
 GITHUB_REPO  = "your-repo"
 
+# Optional path to a local clone of the repository above. When set, config
+# commits are written into the clone with git plumbing (no checkout, staged
+# under refs/pr-config-tool/ so local branches are untouched) and pushed
+# in a single `git push`; only the PRs themselves go through the REST API.
+LOCAL_CLONE_PATH = ""
+
 # ─── Excel Settings ───────────────────────────────────────────────────────────
 # Path to your Excel configuration file (absolute or relative to main.py).
 EXCEL_PATH = "sample_config.xlsx"
@@ -20,5 +26,40 @@ EXCEL_PATH = "sample_config.xlsx"
 # Default labels to apply to every created PR (must already exist in the repo).
 DEFAULT_LABELS = ["config", "automated"]
 
+# How often the PR dashboard polls GitHub, in seconds.
+DASHBOARD_POLL_SECONDS = 60
+
 # PR title template. Available placeholders: {country}, {environment}.
 PR_TITLE_TEMPLATE = "config({country}): Update {environment} configuration"
+
+# ─── Validation Settings ──────────────────────────────────────────────────────
+# Column schema checked against every row when the Excel file is loaded.
+# Supported rule keys: type ("str", "int", "float", "url"), required,
+# pattern (regex, must match the whole value), choices, min, max.
+# Rows that fail validation are flagged in the UI and cannot be submitted.
+# Only Country and Environment are required; the other rules only apply to
+# cells that are filled in, so sheets without these columns still load.
+COLUMN_SCHEMA = {
+    "Country":          {"type": "str", "required": True},
+    "Environment":      {"type": "str", "required": True},
+    "BRANCH_NAME":      {"type": "str", "pattern": r"[A-Za-z0-9._/-]+"},
+    "DB_HOST":          {"type": "str", "pattern": r"[A-Za-z0-9.-]+"},
+    "DB_PORT":          {"type": "int", "min": 1, "max": 65535},
+    "API_BASE_URL":     {"type": "url"},
+    "FEATURE_FLAG_URL": {"type": "url"},
+    "CACHE_TTL":        {"type": "int", "min": 0},
+    "MAX_CONNECTIONS":  {"type": "int", "min": 1},
+}
+
+# ─── Export Settings ──────────────────────────────────────────────────────────
+# Config artifacts rendered for each row, per repository name ("default" is
+# used for any repo not listed). Formats: "json", "yaml", "env", or "template"
+# with a "template" file whose $KEY placeholders are filled from the row.
+# Paths may use {country}, {environment} and {branch}. The rendered files are
+# committed with every PR and written by `python exporter.py`.
+EXPORT_TEMPLATES = {
+    "default": [
+        {"format": "json", "path": "deploy/{country}/{environment}/config.json"},
+        {"format": "env",  "path": "deploy/{country}/{environment}/.env"},
+    ],
+}
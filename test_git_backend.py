@@ -0,0 +1,203 @@
+"""
+test_git_backend.py
+Exercises LocalGitBackend, and GitHubPRCreator's local clone rollout, against
+a bare repository on disk. Opening the PRs themselves is stubbed out.
+
+Run:
+    python -m pytest -q
+"""
+
+import subprocess
+
+import pytest
+
+from git_backend import BranchCommit, LocalGitBackend
+from pr_creator import GitHubPRCreator, PRRequest, PRResult
+
+IDENTITY = {
+    "GIT_AUTHOR_NAME": "Test", "GIT_AUTHOR_EMAIL": "test@example.com",
+    "GIT_COMMITTER_NAME": "Test", "GIT_COMMITTER_EMAIL": "test@example.com",
+}
+
+
+def git(*args: str) -> str:
+    return subprocess.run(["git", *args], check=True, capture_output=True, text=True).stdout
+
+
+def commit_file(worktree, branch: str, path: str, content: str):
+    """Commits and pushes a file from an ordinary clone, as another user would."""
+    git("-C", str(worktree), "checkout", "-q", "-B", branch, f"origin/{branch}")
+    target = worktree / path
+    target.parent.mkdir(parents=True, exist_ok=True)
+    target.write_text(content)
+    git("-C", str(worktree), "add", path)
+    git("-C", str(worktree), "commit", "-q", "-m", f"update {path}")
+    git("-C", str(worktree), "push", "-q", "origin", branch)
+
+
+def tree(remote, branch: str) -> dict[str, str]:
+    names = git("-C", str(remote), "ls-tree", "-r", "--name-only", branch).split()
+    return {n: git("-C", str(remote), "show", f"{branch}:{n}") for n in names}
+
+
+@pytest.fixture
+def repos(tmp_path, monkeypatch):
+    for key, value in IDENTITY.items():
+        monkeypatch.setenv(key, value)
+    remote = tmp_path / "remote.git"
+    other = tmp_path / "other"
+    clone = tmp_path / "clone"
+
+    git("init", "-q", "--bare", "-b", "main", str(remote))
+    git("clone", "-q", str(remote), str(other))
+    (other / "README.md").write_text("hello\n")
+    git("-C", str(other), "add", "README.md")
+    git("-C", str(other), "commit", "-q", "-m", "init")
+    git("-C", str(other), "push", "-q", "origin", "main")
+    git("-C", str(other), "push", "-q", "origin", "main:feature/existing")
+
+    git("clone", "-q", "--no-checkout", str(remote), str(clone))
+    return remote, other, clone
+
+
+def test_commit_and_push_new_and_existing_branches(repos):
+    remote, other, clone = repos
+    backend = LocalGitBackend(str(clone))
+
+    shas = backend.commit_branches(
+        [
+            BranchCommit("feature/new", {"configs/new.json": "{}\n", "configs/.env": "A=1\n"}, "add new"),
+            BranchCommit("feature/existing", {"configs/existing.json": "{}\n"}, "add existing"),
+        ],
+        base_branch="main",
+    )
+    assert set(shas) == {"feature/new", "feature/existing"}
+    assert backend.push(list(shas)) == {}
+
+    assert tree(remote, "feature/new") == {
+        "README.md": "hello\n", "configs/.env": "A=1\n", "configs/new.json": "{}\n",
+    }
+    assert tree(remote, "feature/existing") == {"README.md": "hello\n", "configs/existing.json": "{}\n"}
+    assert git("-C", str(remote), "rev-parse", "feature/new").strip() == shas["feature/new"]
+
+
+def test_fetch_builds_on_remote_refs_ahead_of_stale_local_heads(repos):
+    remote, other, clone = repos
+    backend = LocalGitBackend(str(clone))
+
+    # Push once, then let another user move main and the branch, so the
+    # clone's main and anything we staged earlier are stale.
+    backend.commit_branches([BranchCommit("feature/existing", {"a.txt": "1\n"}, "first")], "main")
+    assert backend.push(["feature/existing"]) == {}
+    git("-C", str(other), "fetch", "-q")
+    commit_file(other, "main", "main.txt", "new main\n")
+    commit_file(other, "feature/existing", "b.txt", "theirs\n")
+
+    backend.fetch()
+    backend.commit_branches(
+        [
+            BranchCommit("feature/existing", {"c.txt": "ours\n"}, "second"),
+            BranchCommit("feature/fresh", {"d.txt": "fresh\n"}, "fresh"),
+        ],
+        base_branch=backend.resolve_base("main"),
+    )
+    assert backend.push(["feature/existing", "feature/fresh"]) == {}
+
+    assert tree(remote, "feature/existing") == {
+        "README.md": "hello\n", "a.txt": "1\n", "b.txt": "theirs\n", "c.txt": "ours\n",
+    }
+    # New branches start from the fetched origin/main, not the clone's old main.
+    assert tree(remote, "feature/fresh") == {
+        "README.md": "hello\n", "main.txt": "new main\n", "d.txt": "fresh\n",
+    }
+
+
+def test_push_reports_non_fast_forward_rejection(repos):
+    remote, other, clone = repos
+    backend = LocalGitBackend(str(clone))
+    before = git("-C", str(remote), "rev-parse", "feature/existing").strip()
+
+    # Someone pushes after our last fetch, so our commit is on a stale tip.
+    commit_file(other, "feature/existing", "b.txt", "theirs\n")
+    backend.commit_branches(
+        [
+            BranchCommit("feature/existing", {"c.txt": "ours\n"}, "stale"),
+            BranchCommit("feature/other", {"e.txt": "ok\n"}, "ok"),
+        ],
+        base_branch="main",
+    )
+    rejected = backend.push(["feature/existing", "feature/other"])
+
+    assert list(rejected) == ["feature/existing"]
+    assert "non-fast-forward" in rejected["feature/existing"] or "fetch first" in rejected["feature/existing"]
+    assert "c.txt" not in tree(remote, "feature/existing")
+    assert git("-C", str(remote), "rev-parse", "feature/existing").strip() != before
+    assert tree(remote, "feature/other") == {"README.md": "hello\n", "e.txt": "ok\n"}
+
+
+def test_checked_out_clone_is_left_untouched(repos):
+    remote, other, clone = repos
+    backend = LocalGitBackend(str(other))    # an ordinary clone with main checked out
+    head = git("-C", str(other), "rev-parse", "HEAD").strip()
+
+    backend.fetch()
+    backend.commit_branches([BranchCommit("main", {"configs/x.json": "{}\n"}, "config")], "main")
+    assert backend.push(["main"]) == {}
+
+    assert tree(remote, "main") == {"README.md": "hello\n", "configs/x.json": "{}\n"}
+    assert git("-C", str(other), "rev-parse", "HEAD").strip() == head
+    assert git("-C", str(other), "status", "--porcelain") == ""
+
+
+def local_creator(clone, schema: dict = None) -> tuple[GitHubPRCreator, list[tuple[str, str]]]:
+    """A creator on `clone` whose PRs are recorded as (head, base) instead of opened."""
+    creator = GitHubPRCreator("token", "owner", "repo", local_clone=str(clone), schema=schema)
+    opened = []
+
+    def open_pr(title, body, head_branch, base_branch, labels=None):
+        opened.append((head_branch, base_branch))
+        return PRResult(success=True, pr_number=len(opened))
+
+    creator._open_pr = open_pr
+    return creator, opened
+
+
+def pr(branch: str, config: dict = None, base: str = "main") -> PRRequest:
+    return PRRequest(f"PR {branch}", "body", branch, base, config, {f"{branch}.json": "{}\n"})
+
+
+def test_create_prs_refuses_invalid_and_duplicate_rows(repos):
+    remote, other, clone = repos
+    creator, opened = local_creator(clone, {"DB_PORT": {"type": "int"}})
+
+    results = creator.create_prs([
+        pr("feature/a", {"DB_PORT": 5432}),
+        pr("feature/b", {"DB_PORT": "not-a-port"}),
+        pr("feature/a", {"DB_PORT": 5433}),
+        pr("feature/c", None),
+    ])
+
+    assert [r.success for r in results] == [True, False, False, False]
+    assert "DB_PORT: expected an integer" in results[1].error
+    assert "already used by PR feature/a" in results[2].error
+    assert "no config row was supplied" in results[3].error
+    assert opened == [("feature/a", "main")]
+    assert "feature/a.json" in tree(remote, "feature/a")
+    assert "feature/b" not in git("-C", str(remote), "branch", "--list")
+
+
+def test_create_prs_maps_push_rejections_and_falls_back_to_default_branch(repos):
+    remote, other, clone = repos
+    # The update hook runs per ref, so only this branch is refused.
+    hook = remote / "hooks" / "update"
+    hook.write_text('#!/bin/sh\ntest "$1" != refs/heads/feature/blocked\n')
+    hook.chmod(0o755)
+    creator, opened = local_creator(clone)
+
+    results = creator.create_prs([pr("feature/ok", base="develop"), pr("feature/blocked", base="develop")])
+
+    assert results[0].success
+    assert not results[1].success and "git push rejected feature/blocked" in results[1].error
+    # "develop" does not exist, so the remote's default branch is used instead.
+    assert opened == [("feature/ok", "main")]
+    assert set(tree(remote, "feature/ok")) == {"README.md", "configs/feature_ok.md", "feature/ok.json"}